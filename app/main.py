@@ -4,27 +4,35 @@ Flask application for VoltWise
 from flask import Flask, jsonify, request, render_template
 from flask_cors import CORS
 import os
-from datetime import datetime, timedelta
+from datetime import datetime
 import numpy as np
-import pandas as pd
+import orjson
+import pyarrow as pa
+import base64
 import logging
+import threading
+import time
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+# Load environment variables
+from dotenv import load_dotenv
+load_dotenv()
+
+# Configure logging (set LOG_LEVEL=DEBUG for verbose request logging)
+log_level_name = os.environ.get('LOG_LEVEL', 'INFO').upper()
+log_level = getattr(logging, log_level_name, None)
+logging.basicConfig(level=log_level if isinstance(log_level, int) else logging.INFO)
 logger = logging.getLogger(__name__)
+if not isinstance(log_level, int):
+    logger.warning("Invalid LOG_LEVEL %r, falling back to INFO", log_level_name)
 
 app = Flask(__name__)
 CORS(app)
 
-# Load environment variables
-from dotenv import load_dotenv
-load_dotenv()
-
 # Import our custom modules
 try:
     from app.models.battery import Battery
     from app.models.optimizer import BatteryOptimizer
-    from app.utils.data_generator import generate_synthetic_data
+    from app.utils.data_generator import generate_synthetic_data, get_cached_synthetic_data
     logger.info("Successfully imported custom modules")
 except Exception as e:
     logger.error(f"Error importing modules: {str(e)}")
@@ -39,11 +47,49 @@ try:
         initial_soc=0.5      # Start at 50% charge
     )
     optimizer = BatteryOptimizer()
+    # Guards battery reads/updates across concurrent requests
+    battery_lock = threading.Lock()
     logger.info("Successfully initialized battery and optimizer")
 except Exception as e:
     logger.error(f"Error initializing components: {str(e)}")
     raise
 
+# Warm up the optimizer path (JIT cache load, pandas/numpy code paths) at
+# startup so the first real request doesn't pay for it
+try:
+    warmup_start = time.perf_counter()
+    warmup_data = generate_synthetic_data(
+        start_time=datetime(2024, 1, 1),
+        horizon_hours=24,
+        interval_minutes=5,
+        seed=0
+    )
+    optimizer.optimize(
+        config=battery.get_config(),
+        initial_soc=battery.current_soc,
+        prices=warmup_data['prices'],
+        forecasts=warmup_data['forecasts']
+    )
+    logger.info(f"Optimizer warm-up completed in {time.perf_counter() - warmup_start:.3f}s")
+except Exception as e:
+    logger.warning(f"Optimizer warm-up failed: {str(e)}")
+
+def _json_response(obj, status=200):
+    """Serialize a response with orjson, passing numpy arrays through natively."""
+    return app.response_class(
+        orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY),
+        status=status,
+        mimetype='application/json'
+    )
+
+def _schedule_to_arrow_b64(schedule):
+    """Encode a schedule DataFrame as a base64 Arrow IPC stream."""
+    table = pa.Table.from_pandas(schedule.reset_index(), preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return base64.b64encode(sink.getvalue()).decode('ascii')
+
 @app.route('/')
 def index():
     """Serve the main application page."""
@@ -57,71 +103,82 @@ def optimize():
         
         # Get parameters from request
         params = request.get_json()
-        logger.debug(f"Request parameters: {params}")
+        logger.debug("Request parameters: %s", params)
         horizon_hours = params.get('horizon_hours', 24)
+        scenario = params.get('scenario', 'normal')
         start_time = datetime.now()
         
-        # Generate synthetic data
+        # Generate synthetic data (reused for repeat requests in the same interval)
         logger.info("Generating synthetic data")
-        data = generate_synthetic_data(
+        data = get_cached_synthetic_data(
             start_time=start_time,
             horizon_hours=horizon_hours,
-            interval_minutes=5
+            interval_minutes=5,
+            scenario=scenario
         )
-        logger.debug(f"Generated data shape - prices: {len(data['prices'])}, forecasts: {len(data['forecasts']['solar'])}")
+        logger.debug("Generated data shape - prices: %d, forecasts: %d",
+                     len(data['prices']), len(data['forecasts']['solar']))
+        
+        # Snapshot the battery so the optimizer never touches shared state
+        with battery_lock:
+            config = battery.get_config()
+            initial_soc = battery.current_soc
         
         # Run optimization
         logger.info("Running optimization")
-        schedule = optimizer.optimize(
-            battery=battery,
+        schedule, metrics = optimizer.optimize(
+            config=config,
+            initial_soc=initial_soc,
             prices=data['prices'],
             forecasts=data['forecasts']
         )
-        logger.debug(f"Optimization complete, schedule shape: {schedule.shape}")
+        logger.debug("Optimization complete, schedule shape: %s", schedule.shape)
+        
+        # Clients that decode Arrow (e.g. arrow.tableFromIPC) can request
+        # the schedule as a binary IPC stream instead of per-column lists
+        if params.get('format') == 'arrow':
+            logger.info("Successfully prepared Arrow response")
+            return _json_response({
+                'success': True,
+                'schedule_arrow_b64': _schedule_to_arrow_b64(schedule),
+                'metrics': metrics
+            })
         
-        # Convert schedule to a format that can be JSON serialized
+        # Columns are passed as float64 arrays; orjson serializes them directly
         schedule_dict = {
             'index': schedule.index.strftime('%Y-%m-%dT%H:%M:%S').tolist(),  # Convert timestamps to ISO strings
-            'price': schedule['price'].astype(float).tolist(),  # Convert numpy types to native Python
-            'power_mw': schedule['power_mw'].astype(float).tolist(),
-            'soc': schedule['soc'].astype(float).tolist(),
-            'profit': schedule['profit'].astype(float).tolist(),
-            'energy_charged': schedule['energy_charged'].astype(float).tolist(),
-            'energy_discharged': schedule['energy_discharged'].astype(float).tolist()
+            'price': schedule['price'].to_numpy(dtype=np.float64),
+            'power_mw': schedule['power_mw'].to_numpy(dtype=np.float64),
+            'soc': schedule['soc'].to_numpy(dtype=np.float64),
+            'profit': schedule['profit'].to_numpy(dtype=np.float64),
+            'energy_charged': schedule['energy_charged'].to_numpy(dtype=np.float64),
+            'energy_discharged': schedule['energy_discharged'].to_numpy(dtype=np.float64)
         }
         
         # Format response
         response = {
             'success': True,
             'schedule': schedule_dict,
-            'metrics': {
-                'total_profit': float(schedule['profit'].sum()),  # Convert numpy types to native Python
-                'energy_charged': float(schedule['energy_charged'].sum()),
-                'energy_discharged': float(schedule['energy_discharged'].sum()),
-                'final_soc': float(schedule['soc'].iloc[-1])
-            }
+            'metrics': metrics
         }
         
         # Log response data for debugging
-        logger.debug("Schedule data types:")
-        for key, value in schedule_dict.items():
-            logger.debug(f"{key}: {type(value)}, length: {len(value)}")
-            if len(value) > 0:
-                logger.debug(f"First value type: {type(value[0])}")
-                logger.debug(f"First value: {value[0]}")
-        
-        logger.debug("Metrics data types:")
-        for key, value in response['metrics'].items():
-            logger.debug(f"{key}: {type(value)}")
-            logger.debug(f"Value: {value}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Schedule data types:")
+            for key, value in schedule_dict.items():
+                logger.debug(f"{key}: {type(value)}, length: {len(value)}")
+                if len(value) > 0:
+                    logger.debug(f"First value type: {type(value[0])}")
+                    logger.debug(f"First value: {value[0]}")
+            
+            logger.debug("Metrics data types:")
+            for key, value in response['metrics'].items():
+                logger.debug(f"{key}: {type(value)}")
+                logger.debug(f"Value: {value}")
         
         logger.info("Successfully prepared response")
         
-        # Convert to JSON string for inspection
-        json_str = jsonify(response).get_data(as_text=True)
-        logger.debug(f"JSON response preview (first 500 chars): {json_str[:500]}")
-        
-        return jsonify(response)
+        return _json_response(response)
         
     except Exception as e:
         logger.error(f"Error in optimization endpoint: {str(e)}", exc_info=True)
@@ -134,12 +191,13 @@ def optimize():
 def battery_status():
     """Get current battery status."""
     try:
-        status = {
-            'capacity_mwh': battery.capacity_mwh,
-            'max_power_mw': battery.max_power_mw,
-            'current_soc': battery.current_soc,
-            'efficiency': battery.efficiency
-        }
+        with battery_lock:
+            status = {
+                'capacity_mwh': battery.capacity_mwh,
+                'max_power_mw': battery.max_power_mw,
+                'current_soc': battery.current_soc,
+                'efficiency': battery.efficiency
+            }
         return jsonify(status)
     except Exception as e:
         logger.error(f"Error in battery status endpoint: {str(e)}", exc_info=True)
@@ -154,12 +212,13 @@ def configure_battery():
     try:
         logger.info("Received battery configuration request")
         params = request.get_json()
-        logger.debug(f"Configuration parameters: {params}")
+        logger.debug("Configuration parameters: %s", params)
         
-        battery.capacity_mwh = float(params.get('capacity_mwh', battery.capacity_mwh))
-        battery.max_power_mw = float(params.get('max_power_mw', battery.max_power_mw))
-        battery.current_soc = float(params.get('initial_soc', battery.current_soc))
-        battery.efficiency = float(params.get('efficiency', battery.efficiency))
+        with battery_lock:
+            battery.capacity_mwh = float(params.get('capacity_mwh', battery.capacity_mwh))
+            battery.max_power_mw = float(params.get('max_power_mw', battery.max_power_mw))
+            battery.current_soc = float(params.get('initial_soc', battery.current_soc))
+            battery.efficiency = float(params.get('efficiency', battery.efficiency))
         
         logger.info("Successfully updated battery configuration")
         return jsonify({
@@ -0,0 +1,127 @@
+"""
+Numba kernels for battery dispatch
+"""
+import numpy as np
+from numba import njit, types
+
+# Numba's on-disk cache is only invalidated when the cached function's own
+# source file changes, so _simulate must live in the same file as the helpers
+# it inlines; otherwise editing them would leave a stale cached kernel.
+
+# Action codes for _available_power
+DISCHARGE = 0
+CHARGE = 1
+
+@njit(cache=True)
+def _available_power(soc, action_code, cap, pmax, eff_c, eff_d, min_soc, max_soc):
+    """
+    Maximum power available for an action, on a 5-minute basis.
+    
+    Args:
+        soc (float): Current state of charge (0-1)
+        action_code (int): DISCHARGE or CHARGE
+        cap (float): Battery capacity in MWh
+        pmax (float): Maximum charge/discharge power in MW
+        eff_c (float): Charge efficiency
+        eff_d (float): Discharge efficiency
+        min_soc (float): Minimum allowed state of charge
+        max_soc (float): Maximum allowed state of charge
+        
+    Returns:
+        float: Available power in MW
+    """
+    if action_code == DISCHARGE:
+        power_from_energy = (soc - min_soc) * cap * 12  # Convert MWh to MW (5-min basis)
+        return min(power_from_energy * eff_d, pmax)
+    power_from_energy = (max_soc - soc) * cap * 12
+    return min(power_from_energy / eff_c, pmax)
+
+@njit(cache=True)
+def _step_and_clip(soc, power_mw, dt, cap, eff_c, eff_d, min_soc, max_soc):
+    """
+    Apply one interval of charge/discharge and clip to the SOC limits.
+    
+    Args:
+        soc (float): Current state of charge (0-1)
+        power_mw (float): Power in MW (positive for discharge, negative for charge)
+        dt (float): Interval length in hours
+        cap (float): Battery capacity in MWh
+        eff_c (float): Charge efficiency
+        eff_d (float): Discharge efficiency
+        min_soc (float): Minimum allowed state of charge
+        max_soc (float): Maximum allowed state of charge
+        
+    Returns:
+        float: New state of charge
+    """
+    if power_mw > 0:  # Discharging
+        soc -= power_mw * dt / eff_d / cap
+    else:  # Charging (power_mw is negative)
+        soc += -power_mw * dt * eff_c / cap
+    return min(max(soc, min_soc), max_soc)
+
+# Explicit signature compiles the kernel eagerly at import (or loads it from
+# the on-disk cache), so the first request doesn't pay for JIT compilation.
+# Prices are typed read-only since pandas may hand back read-only views.
+_f8 = types.float64
+_prices_type = types.Array(_f8, 1, 'A', readonly=True)
+
+@njit(types.UniTuple(_f8[:], 5)(_prices_type, _f8, _f8, _f8, _f8, _f8,
+                                 _f8, _f8, _f8, _f8, _f8),
+      cache=True, fastmath=True)
+def _simulate(prices, soc0, cap, pmax, eff_c, eff_d, min_soc, max_soc,
+              ch_thr, dis_thr, dt):
+    """
+    Run the price-threshold dispatch rule over a full price series.
+    
+    Profit and energy are computed in the same pass as the SOC recurrence.
+    
+    Args:
+        prices (np.ndarray): Prices for each interval in $/MWh
+        soc0 (float): Starting state of charge (0-1)
+        cap (float): Battery capacity in MWh
+        pmax (float): Maximum charge/discharge power in MW
+        eff_c (float): Charge efficiency
+        eff_d (float): Discharge efficiency
+        min_soc (float): Minimum allowed state of charge
+        max_soc (float): Maximum allowed state of charge
+        ch_thr (float): Charge below this price
+        dis_thr (float): Discharge above this price
+        dt (float): Interval length in hours
+        
+    Returns:
+        tuple: (power, soc, profit, energy_charged, energy_discharged) arrays,
+            power positive for discharge
+    """
+    n = prices.shape[0]
+    power = np.empty(n)
+    soc_out = np.empty(n)
+    profit = np.zeros(n)
+    energy_charged = np.zeros(n)
+    energy_discharged = np.zeros(n)
+    soc = soc0
+    
+    for i in range(n):
+        price = prices[i]
+        
+        if price < ch_thr and soc < 0.95:
+            p = -_available_power(soc, CHARGE, cap, pmax, eff_c, eff_d, min_soc, max_soc)
+        elif price > dis_thr and soc > 0.05:
+            p = _available_power(soc, DISCHARGE, cap, pmax, eff_c, eff_d, min_soc, max_soc)
+        else:
+            p = 0.0
+            
+        soc = _step_and_clip(soc, p, dt, cap, eff_c, eff_d, min_soc, max_soc)
+        
+        energy = p * dt
+        power[i] = p
+        soc_out[i] = soc
+        # Idle intervals keep profit at +0.0; -energy * price would give -0.0
+        if energy != 0:
+            profit[i] = -energy * price  # Negative because we pay when charging
+        if energy > 0:
+            energy_discharged[i] = energy
+        elif energy < 0:
+            energy_charged[i] = -energy
+        
+    return power, soc_out, profit, energy_charged, energy_discharged
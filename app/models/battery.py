@@ -1,4 +1,12 @@
-import numpy as np
+import math
+from collections import namedtuple
+from app.models._kernels import CHARGE, DISCHARGE, _available_power, _step_and_clip
+
+# Immutable snapshot of the battery parameters used by the optimizer
+BatteryConfig = namedtuple(
+    'BatteryConfig',
+    'capacity_mwh max_power_mw eff_c eff_d min_soc max_soc'
+)
 
 class Battery:
     """
@@ -16,19 +24,30 @@ class Battery:
             efficiency (float): Round-trip efficiency (0-1)
             initial_soc (float): Initial state of charge (0-1)
         """
-        self.capacity_mwh = capacity_mwh
-        self.max_power_mw = max_power_mw
-        self.efficiency = efficiency
-        self.current_soc = initial_soc
-        
-        # Derived parameters
-        self.charge_efficiency = np.sqrt(efficiency)  # Split round-trip efficiency
-        self.discharge_efficiency = np.sqrt(efficiency)
+        # Stored as plain floats; numpy scalars are much slower for scalar math
+        self.capacity_mwh = float(capacity_mwh)
+        self.max_power_mw = float(max_power_mw)
+        self.efficiency = efficiency  # Also sets charge/discharge efficiency
+        self.current_soc = float(initial_soc)
         
         # Operational limits
         self.min_soc = 0.1  # Don't discharge below 10%
         self.max_soc = 0.9  # Don't charge above 90%
         
+    @property
+    def efficiency(self):
+        """float: Round-trip efficiency (0-1)."""
+        return self._efficiency
+        
+    @efficiency.setter
+    def efficiency(self, value):
+        self._efficiency = float(value)
+        
+        # Derived parameters, kept in sync whenever efficiency changes
+        root = math.sqrt(self._efficiency)  # Split round-trip efficiency
+        self.charge_efficiency = root
+        self.discharge_efficiency = root
+        
     def get_available_power(self, action='discharge'):
         """
         Calculate available power for charge or discharge.
@@ -40,20 +59,19 @@ class Battery:
             float: Maximum power available for the action in MW
         """
         if action == 'discharge':
-            # How much can we discharge?
-            energy_available = (self.current_soc - self.min_soc) * self.capacity_mwh
-            power_from_energy = energy_available * 12  # Convert MWh to MW (5-min basis)
-            return min(power_from_energy * self.discharge_efficiency, self.max_power_mw)
-            
+            action_code = DISCHARGE
         elif action == 'charge':
-            # How much can we charge?
-            energy_headroom = (self.max_soc - self.current_soc) * self.capacity_mwh
-            power_from_energy = energy_headroom * 12  # Convert MWh to MW (5-min basis)
-            return min(power_from_energy / self.charge_efficiency, self.max_power_mw)
-            
+            action_code = CHARGE
         else:
             raise ValueError(f"Unknown action: {action}")
             
+        return _available_power(
+            self.current_soc, action_code,
+            self.capacity_mwh, self.max_power_mw,
+            self.charge_efficiency, self.discharge_efficiency,
+            self.min_soc, self.max_soc
+        )
+            
     def step(self, power_mw, interval_hours=1/12):
         """
         Update battery state based on charge/discharge power.
@@ -65,24 +83,12 @@ class Battery:
         Returns:
             dict: Updated battery state information
         """
-        if power_mw > 0:  # Discharging
-            # Apply discharge efficiency
-            energy_out = power_mw * interval_hours
-            energy_from_battery = energy_out / self.discharge_efficiency
-            
-            # Update SOC
-            self.current_soc -= energy_from_battery / self.capacity_mwh
-            
-        else:  # Charging (power_mw is negative)
-            # Apply charge efficiency
-            energy_in = -power_mw * interval_hours  # Make positive for charging
-            energy_to_battery = energy_in * self.charge_efficiency
-            
-            # Update SOC
-            self.current_soc += energy_to_battery / self.capacity_mwh
-            
-        # Ensure SOC stays within bounds
-        self.current_soc = np.clip(self.current_soc, self.min_soc, self.max_soc)
+        self.current_soc = _step_and_clip(
+            self.current_soc, float(power_mw), float(interval_hours),
+            self.capacity_mwh,
+            self.charge_efficiency, self.discharge_efficiency,
+            self.min_soc, self.max_soc
+        )
         
         return {
             'soc': self.current_soc,
@@ -98,10 +104,31 @@ class Battery:
             soc (float, optional): State of charge to reset to. If None, uses initial_soc
         """
         if soc is not None:
-            self.current_soc = np.clip(soc, self.min_soc, self.max_soc)
+            # Plain comparisons; np.clip on a scalar goes through ufunc dispatch
+            if soc < self.min_soc:
+                soc = self.min_soc
+            elif soc > self.max_soc:
+                soc = self.max_soc
+            self.current_soc = float(soc)
         else:
             self.current_soc = 0.5  # Default to 50%
             
+    def get_config(self):
+        """
+        Get an immutable snapshot of the battery parameters.
+        
+        Returns:
+            BatteryConfig: Capacity, power limit, efficiencies and SOC limits
+        """
+        return BatteryConfig(
+            capacity_mwh=self.capacity_mwh,
+            max_power_mw=self.max_power_mw,
+            eff_c=self.charge_efficiency,
+            eff_d=self.discharge_efficiency,
+            min_soc=self.min_soc,
+            max_soc=self.max_soc
+        )
+        
     def get_state(self):
         """
         Get current battery state.
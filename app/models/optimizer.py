@@ -2,6 +2,8 @@ import numpy as np
 import pandas as pd
 import logging
 
+from app.models._kernels import _simulate
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -14,91 +16,75 @@ class BatteryOptimizer:
         """Initialize the optimizer."""
         logger.info("Initializing BatteryOptimizer")
         
-    def optimize(self, battery, prices, forecasts):
+    def optimize(self, config, initial_soc, prices, forecasts):
         """
         Generate optimized dispatch schedule using a simple price-based strategy.
         
+        Does not modify any shared state, so it is safe to call concurrently.
+        
         Args:
-            battery (Battery): Battery instance
+            config (BatteryConfig): Battery parameters
+            initial_soc (float): State of charge at the start of the schedule (0-1),
+                clamped to the battery's SOC limits
             prices (pd.Series): Price data
             forecasts (dict): Forecast data
             
         Returns:
-            pd.DataFrame: Optimized dispatch schedule
+            tuple: (schedule, metrics) where schedule is a pd.DataFrame of the
+                optimized dispatch and metrics is a dict of totals and final SOC
         """
         logger.info("Starting optimization")
         try:
-            # Initialize results storage
-            results = []
-            current_time = prices.index[0]
-            end_time = prices.index[-1]
+            dt = 5/60
+            price_arr = prices.to_numpy(dtype=np.float64)
             
             # Calculate price thresholds for charging/discharging
-            price_mean = prices.mean()
-            price_std = prices.std()
+            price_mean = price_arr.mean()
+            price_std = price_arr.std(ddof=1)  # Match pandas' sample std
             charge_threshold = price_mean - 0.5 * price_std
             discharge_threshold = price_mean + 0.5 * price_std
             
-            # Reset battery to initial state
-            battery.reset()
+            # Start within the SOC limits, as Battery.reset(soc) does
+            soc0 = float(initial_soc)
+            if soc0 < config.min_soc:
+                soc0 = config.min_soc
+            elif soc0 > config.max_soc:
+                soc0 = config.max_soc
             
-            while current_time <= end_time:
-                # Get current state
-                state = battery.get_state()
-                price = prices[current_time]
-                solar = forecasts['solar'][current_time]
-                
-                # Simple rule-based strategy:
-                # 1. If price is low and battery not full -> charge
-                # 2. If price is high and battery not empty -> discharge
-                # 3. Otherwise -> idle
-                
-                if price < charge_threshold and state['soc'] < 0.95:
-                    # Charge at max rate
-                    max_charge = battery.get_available_power('charge')
-                    power = -max_charge  # Negative for charging
-                elif price > discharge_threshold and state['soc'] > 0.05:
-                    # Discharge at max rate
-                    max_discharge = battery.get_available_power('discharge')
-                    power = max_discharge
-                else:
-                    # Idle
-                    power = 0
-                    
-                # Apply the action and get updated state
-                updated = battery.step(power, interval_hours=5/60)
-                
-                # Calculate profit for this interval
-                profit = -power * price * (5/60)  # Negative because we pay when charging
-                
-                # Store results
-                results.append({
-                    'timestamp': current_time,
-                    'power_mw': power,
-                    'soc': updated['soc'],
-                    'price': price,
-                    'profit': profit
-                })
-                
-                # Move to next time step
-                current_time = current_time + pd.Timedelta(minutes=5)
+            # Simple rule-based strategy:
+            # 1. If price is low and battery not full -> charge
+            # 2. If price is high and battery not empty -> discharge
+            # 3. Otherwise -> idle
+            power, soc, profit, energy_charged, energy_discharged = _simulate(
+                price_arr, soc0,
+                config.capacity_mwh, config.max_power_mw,
+                config.eff_c, config.eff_d, config.min_soc, config.max_soc,
+                float(charge_threshold), float(discharge_threshold), dt
+            )
             
             logger.info("Optimization completed successfully")
             
-            # Convert results to DataFrame
-            schedule = pd.DataFrame(results)
-            schedule.set_index('timestamp', inplace=True)
+            # Build the schedule in one shot, energy columns included
+            schedule = pd.DataFrame({
+                'power_mw': power,
+                'soc': soc,
+                'price': price_arr,
+                'profit': profit,
+                'energy_charged': energy_charged,
+                'energy_discharged': energy_discharged
+            }, index=prices.index)
+            schedule.index.name = 'timestamp'
             
-            # Add energy columns
-            schedule['energy_charged'] = np.where(schedule['power_mw'] < 0,
-                                                -schedule['power_mw'] * (5/60),
-                                                0)
-            schedule['energy_discharged'] = np.where(schedule['power_mw'] > 0,
-                                                   schedule['power_mw'] * (5/60),
-                                                   0)
+            # Reduce the raw arrays directly rather than through pandas
+            metrics = {
+                'total_profit': float(profit.sum()),
+                'energy_charged': float(energy_charged.sum()),
+                'energy_discharged': float(energy_discharged.sum()),
+                'final_soc': float(soc[-1])
+            }
             
-            return schedule
+            return schedule, metrics
             
         except Exception as e:
             logger.error(f"Error in optimize: {str(e)}")
-            raise 
\ No newline at end of file
+            raise
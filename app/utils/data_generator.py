@@ -1,8 +1,19 @@
+import functools
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 
-def generate_price_data(start_time, periods, interval_minutes=5, scenario='normal'):
+# Shared random generator for unseeded calls
+_rng = np.random.default_rng()
+
+def _get_rng(seed):
+    """Return the shared generator, or one built from seed (int or Generator)."""
+    if seed is None:
+        return _rng
+    return np.random.default_rng(seed)
+
+def generate_price_data(start_time, periods, interval_minutes=5, scenario='normal', seed=None,
+                        time_index=None):
     """
     Generate synthetic electricity price data.
     
@@ -11,6 +22,8 @@ def generate_price_data(start_time, periods, interval_minutes=5, scenario='norma
         periods (int): Number of periods to generate
         interval_minutes (int): Time interval in minutes
         scenario (str): Type of price scenario ('normal', 'volatile', 'high_peaks')
+        seed (int or np.random.Generator, optional): Seed or generator for reproducible prices
+        time_index (pd.DatetimeIndex, optional): Prebuilt index to use for the result
         
     Returns:
         pd.Series: Time series of prices
@@ -18,35 +31,29 @@ def generate_price_data(start_time, periods, interval_minutes=5, scenario='norma
     # Base parameters
     base_price = 50  # Base price in $/MWh
     
-    # Time-based components
-    time_index = pd.date_range(
-        start=start_time,
-        periods=periods,
-        freq=f'{interval_minutes}min'
-    )
+    # Hour of day for each period, computed directly rather than
+    # extracted from a DatetimeIndex
+    start_minute = start_time.hour * 60 + start_time.minute
+    hours = ((np.arange(periods) * interval_minutes + start_minute) // 60) % 24
     
     # Hour of day effect (peak during morning and evening)
-    hours = time_index.hour
     hour_effect = (
         10 * np.sin(2 * np.pi * (hours - 8) / 24) +  # Morning peak
         15 * np.sin(2 * np.pi * (hours - 18) / 24)   # Evening peak
     )
     
     # Random component
+    rng = _get_rng(seed)
     if scenario == 'normal':
-        noise = np.random.normal(0, 5, periods)
+        noise = rng.standard_normal(periods) * 5
     elif scenario == 'volatile':
-        noise = np.random.normal(0, 15, periods)
+        noise = rng.standard_normal(periods) * 15
     elif scenario == 'high_peaks':
-        noise = np.random.normal(0, 5, periods)
+        noise = rng.standard_normal(periods) * 5
         # Add occasional price spikes
         spike_prob = 0.02
-        spikes = np.random.choice(
-            [0, 1],
-            size=periods,
-            p=[1-spike_prob, spike_prob]
-        )
-        noise += spikes * np.random.uniform(50, 100, periods)
+        spikes = rng.random(periods) < spike_prob
+        noise += spikes * rng.uniform(50, 100, periods)
     else:
         raise ValueError(f"Unknown scenario: {scenario}")
         
@@ -56,9 +63,16 @@ def generate_price_data(start_time, periods, interval_minutes=5, scenario='norma
     # Ensure no negative prices
     prices = np.maximum(prices, 0)
     
+    if time_index is None:
+        time_index = pd.date_range(
+            start=start_time,
+            periods=periods,
+            freq=f'{interval_minutes}min'
+        )
+    
     return pd.Series(prices, index=time_index)
 
-def generate_solar_forecast(start_time, periods, interval_minutes=5):
+def generate_solar_forecast(start_time, periods, interval_minutes=5, time_index=None, seed=None):
     """
     Generate synthetic solar generation forecast.
     
@@ -66,15 +80,18 @@ def generate_solar_forecast(start_time, periods, interval_minutes=5):
         start_time (datetime): Start time for the data
         periods (int): Number of periods to generate
         interval_minutes (int): Time interval in minutes
+        time_index (pd.DatetimeIndex, optional): Prebuilt index to use for the result
+        seed (int or np.random.Generator, optional): Seed or generator for reproducible output
         
     Returns:
         pd.Series: Time series of solar generation forecasts (0-1 scale)
     """
-    time_index = pd.date_range(
-        start=start_time,
-        periods=periods,
-        freq=f'{interval_minutes}min'
-    )
+    if time_index is None:
+        time_index = pd.date_range(
+            start=start_time,
+            periods=periods,
+            freq=f'{interval_minutes}min'
+        )
     
     # Solar generation follows a bell curve during daylight hours
     hours = time_index.hour + time_index.minute / 60
@@ -83,12 +100,13 @@ def generate_solar_forecast(start_time, periods, interval_minutes=5):
     solar = np.maximum(0, np.sin(np.pi * (hours - 6) / 12))
     
     # Add some noise to represent cloud cover, etc.
-    noise = np.random.normal(0, 0.1, periods)
+    noise = _get_rng(seed).standard_normal(periods) * 0.1
     solar = np.clip(solar + noise, 0, 1)
     
     return pd.Series(solar, index=time_index)
 
-def generate_synthetic_data(start_time, horizon_hours=24, interval_minutes=5):
+def generate_synthetic_data(start_time, horizon_hours=24, interval_minutes=5, seed=None,
+                            scenario='normal'):
     """
     Generate complete synthetic dataset including prices and forecasts.
     
@@ -96,24 +114,39 @@ def generate_synthetic_data(start_time, horizon_hours=24, interval_minutes=5):
         start_time (datetime): Start time for the data
         horizon_hours (int): Number of hours to generate data for
         interval_minutes (int): Time interval in minutes
+        seed (int or np.random.Generator, optional): Seed or generator for reproducible data
+        scenario (str): Type of price scenario ('normal', 'volatile', 'high_peaks')
         
     Returns:
         dict: Dictionary containing price and forecast data
     """
     periods = int(horizon_hours * 60 / interval_minutes)
+    rng = _get_rng(seed)
+    
+    # Build the shared time index once
+    time_index = pd.date_range(
+        start=start_time,
+        periods=periods,
+        freq=f'{interval_minutes}min'
+    )
     
     # Generate price data
     prices = generate_price_data(
         start_time=start_time,
         periods=periods,
-        interval_minutes=interval_minutes
+        interval_minutes=interval_minutes,
+        scenario=scenario,
+        seed=rng,
+        time_index=time_index
     )
     
     # Generate solar forecast
     solar = generate_solar_forecast(
         start_time=start_time,
         periods=periods,
-        interval_minutes=interval_minutes
+        interval_minutes=interval_minutes,
+        time_index=time_index,
+        seed=rng
     )
     
     # Package data
@@ -131,6 +164,69 @@ def generate_synthetic_data(start_time, horizon_hours=24, interval_minutes=5):
     
     return data
 
+@functools.lru_cache(maxsize=32)
+def _cached_synthetic_arrays(start_time, horizon_hours, interval_minutes, scenario):
+    """Generate a dataset once per key and keep it as read-only arrays."""
+    data = generate_synthetic_data(
+        start_time=start_time,
+        horizon_hours=horizon_hours,
+        interval_minutes=interval_minutes,
+        scenario=scenario
+    )
+    
+    prices = data['prices'].to_numpy(copy=True)
+    solar = data['forecasts']['solar'].to_numpy(copy=True)
+    prices.flags.writeable = False
+    solar.flags.writeable = False
+    
+    return data['prices'].index, prices, solar
+
+def get_cached_synthetic_data(start_time, horizon_hours=24, interval_minutes=5, seed=None,
+                              scenario='normal'):
+    """
+    Get a synthetic dataset, reusing recent results for identical requests.
+    
+    Unseeded requests are keyed by start time (floored to the interval),
+    horizon, interval and scenario, so repeated calls within the same
+    interval share one dataset. Seeded requests are always generated fresh.
+    
+    Args:
+        start_time (datetime): Start time for the data
+        horizon_hours (int): Number of hours to generate data for
+        interval_minutes (int): Time interval in minutes
+        seed (int or np.random.Generator, optional): Seed or generator for reproducible data
+        scenario (str): Type of price scenario ('normal', 'volatile', 'high_peaks')
+        
+    Returns:
+        dict: Dictionary containing price and forecast data
+    """
+    if seed is not None:
+        return generate_synthetic_data(
+            start_time=start_time,
+            horizon_hours=horizon_hours,
+            interval_minutes=interval_minutes,
+            seed=seed,
+            scenario=scenario
+        )
+    
+    start_time = pd.Timestamp(start_time).floor(f'{interval_minutes}min').to_pydatetime()
+    time_index, prices, solar = _cached_synthetic_arrays(
+        start_time, horizon_hours, interval_minutes, scenario
+    )
+    
+    # Hand out copies so callers can't modify the cached arrays
+    return {
+        'prices': pd.Series(prices.copy(), index=time_index),
+        'forecasts': {
+            'solar': pd.Series(solar.copy(), index=time_index)
+        },
+        'metadata': {
+            'start_time': start_time,
+            'horizon_hours': horizon_hours,
+            'interval_minutes': interval_minutes
+        }
+    }
+
 def get_sample_day(scenario='normal'):
     """
     Get a sample day of data for demonstration.
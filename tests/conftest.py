@@ -0,0 +1,23 @@
+"""
+Shared pytest fixtures for the VoltWise test suite
+"""
+import pytest
+from datetime import datetime
+from app.utils.data_generator import generate_synthetic_data
+
+# Fixed start and seed so fixture data is identical across runs and workers
+_START_TIME = datetime(2024, 1, 1)
+_SEED = 42
+
+@pytest.fixture(scope="session")
+def synthetic_data():
+    """One seeded day of 5-minute synthetic data, generated once per test run.
+    
+    Shared by all tests; copy before modifying.
+    """
+    return generate_synthetic_data(
+        start_time=_START_TIME,
+        horizon_hours=24,
+        interval_minutes=5,
+        seed=_SEED
+    )
@@ -18,6 +18,20 @@ def test_battery_initialization():
     assert np.isclose(battery.charge_efficiency, np.sqrt(0.92))
     assert np.isclose(battery.discharge_efficiency, np.sqrt(0.92))
 
+def test_battery_efficiency_update():
+    """Test that changing efficiency updates the derived efficiencies."""
+    battery = Battery(
+        capacity_mwh=100.0,
+        max_power_mw=20.0,
+        efficiency=0.92,
+        initial_soc=0.5
+    )
+    
+    battery.efficiency = 0.81
+    assert battery.efficiency == 0.81
+    assert np.isclose(battery.charge_efficiency, 0.9)
+    assert np.isclose(battery.discharge_efficiency, 0.9)
+
 def test_battery_power_limits():
     """Test battery power limits based on SOC."""
     battery = Battery(
@@ -65,6 +79,9 @@ def test_battery_step():
     assert battery.current_soc < initial_soc
     assert result['power_mw'] == 10.0
     assert result['energy_change_mwh'] == 10.0
+    
+    # State should stay a plain Python float, not a numpy scalar
+    assert type(battery.current_soc) is float
 
 def test_battery_constraints():
     """Test that battery respects SOC constraints."""
@@ -110,4 +127,5 @@ def test_battery_reset():
     
     # Reset to specific value
     battery.reset(soc=0.7)
-    assert battery.current_soc == 0.7 
\ No newline at end of file
+    assert battery.current_soc == 0.7
+    assert type(battery.current_soc) is float 
\ No newline at end of file
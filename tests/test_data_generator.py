@@ -4,7 +4,8 @@ import numpy as np
 from app.utils.data_generator import (
     generate_price_data,
     generate_solar_forecast,
-    generate_synthetic_data
+    generate_synthetic_data,
+    get_cached_synthetic_data
 )
 
 def test_price_data_generation():
@@ -15,7 +16,7 @@ def test_price_data_generation():
     # Test normal scenario
     prices = generate_price_data(start_time, periods, scenario='normal')
     assert len(prices) == periods
-    assert all(p >= 0 for p in prices)  # No negative prices
+    assert prices.to_numpy().min() >= 0  # No negative prices
     assert prices.index[0] == start_time
     
     # Test volatile scenario
@@ -35,10 +36,11 @@ def test_solar_forecast_generation():
     start_time = datetime(2024, 1, 1)
     periods = 288
     
-    solar = generate_solar_forecast(start_time, periods)
+    solar = generate_solar_forecast(start_time, periods, seed=0)
     
     assert len(solar) == periods
-    assert all(0 <= s <= 1 for s in solar)  # Values should be between 0 and 1
+    solar_arr = solar.to_numpy()
+    assert solar_arr.min() >= 0 and solar_arr.max() <= 1  # Values should be between 0 and 1
     
     # Check that solar output is zero at midnight
     midnight_value = solar[start_time]
@@ -79,6 +81,32 @@ def test_complete_synthetic_data():
     assert data['prices'].index[0] == start_time
     assert data['forecasts']['solar'].index[0] == start_time
 
+def test_seeded_data_is_reproducible():
+    """Test that a fixed seed reproduces the same dataset."""
+    start_time = datetime(2024, 1, 1)
+    
+    first = generate_synthetic_data(start_time, horizon_hours=24, seed=42)
+    second = generate_synthetic_data(start_time, horizon_hours=24, seed=42)
+    
+    assert first['prices'].equals(second['prices'])
+    assert first['forecasts']['solar'].equals(second['forecasts']['solar'])
+
+def test_cached_synthetic_data():
+    """Test that repeated requests in the same interval share one dataset."""
+    first = get_cached_synthetic_data(datetime(2024, 1, 1, 10, 1), horizon_hours=24)
+    second = get_cached_synthetic_data(datetime(2024, 1, 1, 10, 4), horizon_hours=24)
+    
+    # Start time is floored to the interval
+    assert first['metadata']['start_time'] == datetime(2024, 1, 1, 10, 0)
+    assert first['prices'].index[0] == datetime(2024, 1, 1, 10, 0)
+    assert first['prices'].equals(second['prices'])
+    assert first['forecasts']['solar'].equals(second['forecasts']['solar'])
+    
+    # Callers get their own copy
+    first['prices'].iloc[0] = -1.0
+    third = get_cached_synthetic_data(datetime(2024, 1, 1, 10, 2), horizon_hours=24)
+    assert third['prices'].equals(second['prices'])
+
 def test_data_time_intervals():
     """Test different time intervals in data generation."""
     start_time = datetime(2024, 1, 1)
@@ -3,27 +3,66 @@ import numpy as np
 import pandas as pd
 from datetime import datetime
 from app.models.battery import Battery
-from app.models.optimizer import BatteryOptimizer
+from app.models.optimizer import BatteryOptimizer, _simulate
 from app.utils.data_generator import generate_synthetic_data
 
+# Length of one 5-minute interval in hours
+_INTERVAL_HOURS = 5.0 / 60.0
+
+# One hour of 5-minute intervals
+_DEFAULT_INDEX_12 = pd.date_range(start=datetime(2024, 1, 1), periods=12, freq='5min')
+
+@pytest.fixture(scope="module")
+def optimizer():
+    """Optimizer shared by the module; optimize() keeps no state between calls."""
+    return BatteryOptimizer()
+
+@pytest.fixture
+def make_battery():
+    """Factory for the standard test battery, with per-test overrides."""
+    def _make(**overrides):
+        params = {
+            'capacity_mwh': 100.0,
+            'max_power_mw': 20.0,
+            'efficiency': 0.92,
+            'initial_soc': 0.5
+        }
+        params.update(overrides)
+        return Battery(**params)
+    return _make
+
+def test_simulate_kernel():
+    """Test the compiled dispatch kernel directly on a tiny input."""
+    prices = np.array([10.0, 100.0, 50.0])  # Charge, discharge, idle
+    
+    power, soc, profit, energy_charged, energy_discharged = _simulate(
+        prices, 0.5, 100.0, 20.0, 1.0, 1.0, 0.1, 0.9, 40.0, 60.0, _INTERVAL_HOURS
+    )
+    
+    step_energy = 20.0 * _INTERVAL_HOURS
+    np.testing.assert_allclose(power, [-20.0, 20.0, 0.0])
+    np.testing.assert_allclose(soc, [0.5 + step_energy / 100.0, 0.5, 0.5])
+    np.testing.assert_allclose(profit, [step_energy * 10.0, -step_energy * 100.0, 0.0])
+    np.testing.assert_allclose(energy_charged, [step_energy, 0.0, 0.0])
+    np.testing.assert_allclose(energy_discharged, [0.0, step_energy, 0.0])
+    assert not np.signbit(profit[2])  # Idle profit is +0.0, not -0.0
+
+@pytest.mark.xfail(reason="rule-based optimizer has no model/_prepare_features", strict=True)
 def test_optimizer_initialization():
     """Test optimizer initialization."""
     optimizer = BatteryOptimizer()
     assert optimizer.model is not None
     assert optimizer.scaler is None
 
-def test_feature_preparation():
+@pytest.mark.xfail(reason="rule-based optimizer has no model/_prepare_features", strict=True)
+def test_feature_preparation(optimizer):
     """Test feature preparation for the neural network."""
-    optimizer = BatteryOptimizer()
-    
-    # Create sample data
-    start_time = datetime(2024, 1, 1)
+    # Only shapes are checked, so a short horizon is enough
     data = generate_synthetic_data(
-        start_time=start_time,
-        horizon_hours=24,
-        interval_minutes=5
+        start_time=datetime(2024, 1, 1),
+        horizon_hours=1,
+        interval_minutes=15
     )
-    
     battery_state = {
         'soc': 0.5,
         'capacity_mwh': 100.0,
@@ -38,109 +77,121 @@ def test_feature_preparation():
     )
     
     assert features.shape[1] == 4  # Should have 4 features
-    assert not np.any(np.isnan(features))  # No NaN values
-    assert not np.any(np.isinf(features))  # No infinite values
+    assert np.isfinite(features).all()  # No NaN or infinite values
 
-def test_optimization_run():
+@pytest.mark.parametrize("initial_soc", [0.1, 0.5, 0.9])
+def test_optimization_run(optimizer, make_battery, synthetic_data, initial_soc):
     """Test full optimization run."""
-    optimizer = BatteryOptimizer()
-    battery = Battery(
-        capacity_mwh=100.0,
-        max_power_mw=20.0,
-        efficiency=0.92,
-        initial_soc=0.5
-    )
-    
-    # Generate test data
-    start_time = datetime(2024, 1, 1)
-    data = generate_synthetic_data(
-        start_time=start_time,
-        horizon_hours=24,
-        interval_minutes=5
-    )
+    battery = make_battery(initial_soc=initial_soc)
     
     # Run optimization
-    schedule = optimizer.optimize(
-        battery=battery,
-        prices=data['prices'],
-        forecasts=data['forecasts']
+    schedule, metrics = optimizer.optimize(
+        config=battery.get_config(),
+        initial_soc=battery.current_soc,
+        prices=synthetic_data['prices'],
+        forecasts=synthetic_data['forecasts']
     )
     
     # Check schedule structure
     assert isinstance(schedule, pd.DataFrame)
-    assert 'power_mw' in schedule.columns
-    assert 'soc' in schedule.columns
-    assert 'price' in schedule.columns
-    assert 'profit' in schedule.columns
+    missing = {'power_mw', 'soc', 'price', 'profit'} - set(schedule.columns)
+    assert not missing, f"missing columns: {missing}"
     
     # Check schedule values
-    assert len(schedule) == len(data['prices'])
-    assert all(-battery.max_power_mw <= p <= battery.max_power_mw 
-              for p in schedule['power_mw'])
-    assert all(battery.min_soc <= s <= battery.max_soc 
-              for s in schedule['soc'])
+    assert len(schedule) == len(synthetic_data['prices'])
+    power = schedule['power_mw'].to_numpy()
+    assert power.min() >= -battery.max_power_mw and power.max() <= battery.max_power_mw
+    soc = schedule['soc'].to_numpy()
+    assert soc.min() >= battery.min_soc and soc.max() <= battery.max_soc
+    
+    # Check metrics agree with the schedule
+    assert np.isclose(metrics['total_profit'], schedule['profit'].sum())
+    assert np.isclose(metrics['energy_charged'], schedule['energy_charged'].sum())
+    assert np.isclose(metrics['energy_discharged'], schedule['energy_discharged'].sum())
+    assert metrics['final_soc'] == schedule['soc'].iloc[-1]
 
-def test_optimizer_constraints():
+def test_optimizer_constraints(optimizer, make_battery, synthetic_data):
     """Test that optimizer respects battery constraints."""
-    optimizer = BatteryOptimizer()
-    battery = Battery(
-        capacity_mwh=100.0,
-        max_power_mw=20.0,
-        efficiency=0.92,
-        initial_soc=0.1  # Start at minimum SOC
-    )
+    battery = make_battery(initial_soc=0.1)  # Start at minimum SOC
     
-    # Generate test data with high prices at start
-    start_time = datetime(2024, 1, 1)
-    data = generate_synthetic_data(
-        start_time=start_time,
-        horizon_hours=24,
-        interval_minutes=5
-    )
+    # First 4 hours are enough to exercise the SOC-at-minimum path
+    periods = 48
     
-    # Artificially set high prices at start
-    data['prices'].iloc[0:12] = 1000.0
+    # Artificially set high prices at start (on a copy of the shared data)
+    window = synthetic_data['prices'].iloc[:periods]
+    price_arr = window.to_numpy(copy=True)
+    price_arr[:12] = 1000.0
+    prices = pd.Series(price_arr, index=window.index)
+    forecasts = {'solar': synthetic_data['forecasts']['solar'].iloc[:periods]}
     
     # Run optimization
-    schedule = optimizer.optimize(
-        battery=battery,
-        prices=data['prices'],
-        forecasts=data['forecasts']
+    schedule, metrics = optimizer.optimize(
+        config=battery.get_config(),
+        initial_soc=battery.current_soc,
+        prices=prices,
+        forecasts=forecasts
     )
     
     # Check that battery doesn't discharge when SOC is at minimum
     assert schedule['power_mw'].iloc[0] <= 0
     assert schedule['soc'].iloc[0] >= battery.min_soc
 
-def test_optimizer_profit_calculation():
-    """Test that profit calculations are correct."""
-    optimizer = BatteryOptimizer()
-    battery = Battery(
-        capacity_mwh=100.0,
-        max_power_mw=20.0,
-        efficiency=1.0,  # Perfect efficiency for easier calculation
-        initial_soc=0.5
+@pytest.mark.parametrize("initial_soc", [0.0, 0.07, 0.95, 1.0])
+def test_optimizer_out_of_range_initial_soc(optimizer, make_battery, synthetic_data, initial_soc):
+    """Test that an initial SOC outside the limits is clamped before dispatch."""
+    battery = make_battery()
+    
+    # High then low prices at start exercise both branches from the clamped SOC
+    window = synthetic_data['prices'].iloc[:48]
+    price_arr = window.to_numpy(copy=True)
+    price_arr[:6] = 1000.0
+    price_arr[6:12] = 0.0
+    prices = pd.Series(price_arr, index=window.index)
+    forecasts = {'solar': synthetic_data['forecasts']['solar'].iloc[:48]}
+    
+    schedule, metrics = optimizer.optimize(
+        config=battery.get_config(),
+        initial_soc=initial_soc,
+        prices=prices,
+        forecasts=forecasts
     )
     
+    power = schedule['power_mw'].to_numpy()
+    assert np.abs(power).max() <= battery.max_power_mw
+    soc = schedule['soc'].to_numpy()
+    assert soc.min() >= battery.min_soc and soc.max() <= battery.max_soc
+    
+    # SOC change from the clamped start must match the energy actually moved
+    start_soc = min(max(initial_soc, battery.min_soc), battery.max_soc)
+    net_energy = (schedule['energy_charged'].sum() * battery.charge_efficiency
+                  - schedule['energy_discharged'].sum() / battery.discharge_efficiency)
+    assert np.isclose(metrics['final_soc'] - start_soc, net_energy / battery.capacity_mwh)
+
+def test_optimizer_profit_calculation(optimizer, make_battery):
+    """Test that profit calculations are correct."""
+    battery = make_battery(efficiency=1.0)  # Perfect efficiency for easier calculation
+    
     # Create simple price series
-    start_time = datetime(2024, 1, 1)
-    periods = 12  # 1 hour of 5-minute intervals
-    index = pd.date_range(start=start_time, periods=periods, freq='5min')
-    prices = pd.Series(50.0, index=index)  # Constant price
+    index = _DEFAULT_INDEX_12
+    periods = len(index)
+    prices = pd.Series(np.full(periods, 50.0, dtype=np.float64), index=index)  # Constant price
     
     # Create minimal forecasts
-    forecasts = {'solar': pd.Series(0.5, index=index)}
+    forecasts = {'solar': pd.Series(np.full(periods, 0.5, dtype=np.float64), index=index)}
     
     # Run optimization
-    schedule = optimizer.optimize(
-        battery=battery,
+    schedule, metrics = optimizer.optimize(
+        config=battery.get_config(),
+        initial_soc=battery.current_soc,
         prices=prices,
         forecasts=forecasts
     )
     
-    # Calculate expected profit for each interval
-    for _, row in schedule.iterrows():
-        power = row['power_mw']
-        price = row['price']
-        expected_profit = -power * price * (5/60)  # Negative because we pay when charging
-        assert np.isclose(row['profit'], expected_profit, rtol=1e-10) 
\ No newline at end of file
+    # Check expected profit for every interval at once
+    power = schedule['power_mw'].to_numpy()
+    price = schedule['price'].to_numpy()
+    profit = schedule['profit'].to_numpy()
+    expected = np.empty_like(power)
+    np.multiply(power, price, out=expected)
+    expected *= -_INTERVAL_HOURS  # Negative because we pay when charging
+    np.testing.assert_allclose(profit, expected, rtol=1e-10) 
\ No newline at end of file